@@ -1,118 +1,115 @@
 import requests
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.data._pagination import paginate, resolve_window
+from src.data.cache import FundingCache
+
+# Display format for matched timestamps (microseconds are trimmed to milliseconds)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
 # Tolerance in milliseconds for matching timestamps between the two APIs
 TIME_TOLERANCE_MS = 300000  # 5 minutes
 
-def format_timestamp(ts_ms):
-    """Convert a millisecond timestamp to a formatted string including milliseconds."""
-    dt = datetime.fromtimestamp(ts_ms / 1000.0)
-    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+# Funding periods; the most recent period is always re-fetched in case it has not settled yet
+HYPERLIQUID_FUNDING_INTERVAL_MS = 60 * 60 * 1000  # 1 hour
+BINANCE_FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000  # 8 hours
+
+# Shared session so every paginated request reuses a kept-alive TCP/TLS connection
+# instead of paying a fresh handshake per page. Rate limiting and transient server errors
+# are retried here with exponential backoff, honouring any Retry-After header.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.4,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+))
+
+def format_timestamps(ts_ms):
+    """
+    Convert millisecond timestamps to local-time strings including milliseconds.
+    The local UTC offset is looked up once per distinct hour and broadcast, and the
+    shifted values are formatted in one call through pandas' datetime kernels.
+    """
+    ts_ms = np.asarray(ts_ms, dtype=np.int64)
+    # Offsets come from the C library, as in datetime.fromtimestamp. They are read at
+    # both ends of each hour; the rare hour with a transition inside it (zones with
+    # half-hour offsets) is resolved per value.
+    hours, inverse = np.unique(ts_ms // 3_600_000, return_inverse=True)
+    hour_starts = (hours * 3600).tolist()
+    first = np.array([time.localtime(s).tm_gmtoff for s in hour_starts], dtype=np.int64)
+    last = np.array([time.localtime(s + 3599).tm_gmtoff for s in hour_starts], dtype=np.int64)
+    offsets_s = first[inverse]
+    mixed = (first != last)[inverse]
+    if mixed.any():
+        offsets_s[mixed] = [time.localtime(s).tm_gmtoff for s in (ts_ms[mixed] // 1000).tolist()]
+    # Format naive wall-clock values; a tz-aware index would be formatted per value.
+    local = pd.to_datetime(ts_ms + offsets_s * 1000, unit="ms")
+    return local.strftime(TIMESTAMP_FORMAT).str[:-3]
 
 def get_hyperliquid_funding_history_paginated(coin, start_time=None, end_time=None,
-                                              max_records=500, sleep_time=0.2, max_retries=5):
+                                              max_records=500, sleep_time=0.2, cache=None,
+                                              max_workers=6):
     """
     Retrieve Hyperliquid historical funding data via pagination.
-    Returns a sorted list of records.
+    If a FundingCache is given, only the part of the window not cached yet is requested.
+    After the first page, the remaining pages are prefetched by up to `max_workers` threads.
+    Returns a structured array with int64 `time` (ms) and float64 `rate` fields, sorted by time.
     """
     url = "https://api.hyperliquid.xyz/info"
     headers = {"Content-Type": "application/json"}
-    now_ms = int(time.time() * 1000)
-    if end_time is None:
-        end_time = now_ms
-    if start_time is None:
-        one_week_ms = 7 * 24 * 60 * 60 * 1000
-        start_time = end_time - one_week_ms
-
-    all_records = []
-    current_start = start_time
-    retries = 0
-
-    while current_start <= end_time:
+    start_time, end_time = resolve_window(start_time, end_time)
+
+    def build_request(page_start, page_end):
         payload = {
             "type": "fundingHistory",
             "coin": coin,
-            "startTime": current_start,
-            "endTime": end_time
+            "startTime": page_start,
+            "endTime": page_end
         }
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            if response.status_code != 200:
-                raise Exception(f"Hyperliquid API error: {response.status_code} {response.text}")
-            data = response.json()
-            if not data:
-                # If no data is returned, move forward by 1 day
-                current_start += 24 * 60 * 60 * 1000
-                continue
-            all_records.extend(data)
-            if len(data) >= max_records:
-                last_time = data[-1]["time"]
-                current_start = last_time + 1
-            else:
-                break
-            retries = 0
-            time.sleep(sleep_time)
-        except Exception as e:
-            retries += 1
-            if retries > max_retries:
-                break
-            time.sleep(2)
-    all_records.sort(key=lambda x: x["time"])
-    return all_records
-
-def get_binance_funding_history(symbol, start_time=None, end_time=None, max_retries=5):
+        return {"json": payload, "headers": headers}
+
+    # If no data is returned for a page, move forward by 1 day
+    return paginate(_SESSION, "POST", url, build_request, "hyperliquid", coin, "time", max_records,
+                    start_time, end_time, HYPERLIQUID_FUNDING_INTERVAL_MS, cache=cache,
+                    empty_skip_ms=24 * 60 * 60 * 1000, sleep_time=sleep_time, max_workers=max_workers)
+
+def get_binance_funding_history(symbol, start_time=None, end_time=None, cache=None, max_workers=6):
     """
     Retrieve Binance funding data in batches of 1000.
-    Returns a sorted list of records.
+    If a FundingCache is given, only the part of the window not cached yet is requested.
+    After the first page, the remaining pages are prefetched by up to `max_workers` threads.
+    Returns a structured array with int64 `time` (ms) and float64 `rate` fields, sorted by time.
     """
     url = "https://fapi.binance.com/fapi/v1/fundingRate"
-    now_ms = int(time.time() * 1000)
-    if end_time is None:
-        end_time = now_ms
-    if start_time is None:
-        one_week_ms = 7 * 24 * 60 * 60 * 1000
-        start_time = end_time - one_week_ms
-
-    all_records = []
-    current_start = start_time
-    retry_count = 0
-
-    while current_start <= end_time:
+    limit = 1000
+    start_time, end_time = resolve_window(start_time, end_time)
+
+    def build_request(page_start, page_end):
         params = {
             "symbol": symbol,
-            "limit": 1000,
-            "startTime": current_start,
-            "endTime": end_time
+            "limit": limit,
+            "startTime": page_start,
+            "endTime": page_end
         }
-        try:
-            response = requests.get(url, params=params)
-            if response.status_code != 200:
-                raise Exception(f"Binance API error: {response.status_code} {response.text}")
-            data = response.json()
-            if not data:
-                retry_count += 1
-                print(f"Retrying... ({retry_count}/{max_retries})")
-                if retry_count > max_retries:
-                    break
-                time.sleep(1)
-                continue
-            retry_count = 0
-            all_records.extend(data)
-            last_time = data[-1]["fundingTime"]
-            current_start = last_time + 1
-            time.sleep(0.2)
-        except Exception as e:
-            time.sleep(2)
-            print(f"Error: {e}")
-            continue
-
-    all_records.sort(key=lambda x: x["fundingTime"])
-    return all_records
-
-def compare_funding_rates_over_time(hype_coin, binance_symbol, days=7, multiplier=8):
+        return {"params": params}
+
+    return paginate(_SESSION, "GET", url, build_request, "binance", symbol, "fundingTime", limit,
+                    start_time, end_time, BINANCE_FUNDING_INTERVAL_MS, cache=cache,
+                    max_workers=max_workers)
+
+def compare_funding_rates_over_time(hype_coin, binance_symbol, days=7, multiplier=8, cache=None):
     """
     Retrieve funding data from both APIs over the past `days` days, match records using a timestamp tolerance,
     and return a DataFrame containing:
@@ -121,58 +118,71 @@ def compare_funding_rates_over_time(hype_coin, binance_symbol, days=7, multiplie
       - Annualized percentage difference computed as:
           diff_rate * 100 * (24/multiplier * 365)
         (For example, with multiplier=8, this is diff_rate * 100 * 1095.)
+    An optional FundingCache avoids re-downloading history fetched by earlier runs.
     """
-    now_ms = int(time.time() * 1000)
+    now_ms = time.time_ns() // 1_000_000
     start_time = now_ms - (days * 24 * 60 * 60 * 1000)
-    hyper_data = get_hyperliquid_funding_history_paginated(hype_coin, start_time, now_ms)
-    binance_data = get_binance_funding_history(binance_symbol, start_time, now_ms)
+    # The two histories are independent and I/O bound, so fetch them concurrently.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        hyper_future = executor.submit(get_hyperliquid_funding_history_paginated, hype_coin, start_time, now_ms,
+                                       cache=cache)
+        binance_future = executor.submit(get_binance_funding_history, binance_symbol, start_time, now_ms,
+                                         cache=cache)
+        hyper = hyper_future.result()
+        binance = binance_future.result()
     
-    results = []
-    i, j = 0, 0
-    while i < len(hyper_data) and j < len(binance_data):
-        hyper_time = hyper_data[i]["time"]
-        binance_time = binance_data[j]["fundingTime"]
-        if abs(hyper_time - binance_time) <= TIME_TOLERANCE_MS:
-            hyper_rate = float(hyper_data[i]["fundingRate"])
-            binance_rate = float(binance_data[j]["fundingRate"])
-            # Multiply Hyperliquid's hourly rate by the multiplier (e.g., 8 for an 8h equivalent)
-            hyper_adjusted = hyper_rate * multiplier
-            diff_rate = hyper_adjusted - binance_rate
-            # Annualize the difference:
-            # For an 8h funding period, there are 24/8 * 365 = 1095 periods per year.
-            # In general, annualized factor = (24/multiplier * 365)
-            annualized_diff = diff_rate * (24/multiplier * 365) * 100
-            results.append({
-                "Timestamp_Hyperliquid": format_timestamp(hyper_time),
-                "Timestamp_Binance": format_timestamp(binance_time),
-                "Hyperliquid_Rate (%)": hyper_rate * 100,
-                "Hyperliquid_Adjusted (%)": hyper_adjusted * 100,
-                "Binance_Rate (%)": binance_rate * 100,
-                "Annualized_Difference (%)": annualized_diff
-            })
-            i += 1
-            j += 1
-        elif hyper_time < binance_time:
-            i += 1
-        else:
-            j += 1
-
-    df = pd.DataFrame(results)
+    if len(hyper) == 0 or len(binance) == 0:
+        return pd.DataFrame()
+
+    # Pair each Hyperliquid record with the nearest Binance record within the tolerance:
+    # binary-search each Hyperliquid time into the sorted Binance times and keep the closer
+    # of the two neighbours.
+    hyper_times = hyper["time"]
+    binance_times = binance["time"]
+    right = np.searchsorted(binance_times, hyper_times)
+    left = np.maximum(right - 1, 0)
+    right = np.minimum(right, len(binance_times) - 1)
+    left_gap = np.abs(hyper_times - binance_times[left])
+    right_gap = np.abs(binance_times[right] - hyper_times)
+    nearest = np.where(right_gap < left_gap, right, left)
+    matched = np.minimum(left_gap, right_gap) <= TIME_TOLERANCE_MS
+    binance_idx = nearest[matched]
+
+    hyper_rate = hyper["rate"][matched]
+    binance_rate = binance["rate"][binance_idx]
+    # Multiply Hyperliquid's hourly rate by the multiplier (e.g., 8 for an 8h equivalent)
+    hyper_adjusted = hyper_rate * multiplier
+    # Annualize the difference:
+    # For an 8h funding period, there are 24/8 * 365 = 1095 periods per year.
+    # In general, annualized factor = (24/multiplier * 365); the percentage scaling is folded
+    # into the same scalar so the column is multiplied only once.
+    annual_factor = (24.0 / multiplier) * 365.0 * 100.0
+    annualized_diff = (hyper_adjusted - binance_rate) * annual_factor
+
+    df = pd.DataFrame({
+        "Timestamp_Hyperliquid": format_timestamps(hyper_times[matched]),
+        "Timestamp_Binance": format_timestamps(binance_times[binance_idx]),
+        "Hyperliquid_Rate (%)": hyper_rate * 100,
+        "Hyperliquid_Adjusted (%)": hyper_adjusted * 100,
+        "Binance_Rate (%)": binance_rate * 100,
+        "Annualized_Difference (%)": annualized_diff
+    })
     return df
 
 def plot_funding_rate_difference_over_time(df):
     """Plot the annualized percentage funding rate difference over time from the DataFrame."""
-    df["Timestamp"] = pd.to_datetime(df["Timestamp_Hyperliquid"])
-    plt.figure(figsize=(12, 6))
-    plt.plot(df["Timestamp"], df["Annualized_Difference (%)"], marker='o', linestyle='-', 
-             label="Annualized % Difference")
-    plt.xlabel("Timestamp")
-    plt.ylabel("Annualized Difference (%)")
-    plt.title("Annualized % Difference in Funding Rates Over Time")
-    plt.legend()
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    df["Timestamp"] = pd.to_datetime(df["Timestamp_Hyperliquid"], format=TIMESTAMP_FORMAT)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    # Small point markers keep long histories cheap to draw; very long ones are rasterized.
+    ax.plot(df["Timestamp"], df["Annualized_Difference (%)"], marker='.', linestyle='-', linewidth=1,
+            rasterized=len(df) > 2000, label="Annualized % Difference")
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Annualized Difference (%)")
+    ax.set_title("Annualized % Difference in Funding Rates Over Time")
+    ax.legend()
+    ax.grid(True)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
     plt.show()
 
 if __name__ == "__main__":
@@ -180,7 +190,9 @@ if __name__ == "__main__":
     days_to_fetch = 14
     multiplier = 4  # Set to 8 for an 8h funding period or 4 if applicable
     try:
-        df = compare_funding_rates_over_time("ENA", "ENAUSDT", days=days_to_fetch, multiplier=multiplier)
+        cache = FundingCache()
+        df = compare_funding_rates_over_time("ENA", "ENAUSDT", days=days_to_fetch, multiplier=multiplier,
+                                             cache=cache)
         print(df)
         plot_funding_rate_difference_over_time(df)
     except Exception as e:
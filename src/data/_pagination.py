@@ -0,0 +1,223 @@
+import logging
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from src.data.cache import FundingCache
+
+# Prefer a fast native JSON decoder for API pages (also used by the kline collectors);
+# all three accept raw bytes.
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+logger = logging.getLogger(__name__)
+
+# Record layout of a fetched funding series
+FUNDING_DTYPE = np.dtype([("time", "i8"), ("rate", "f8")])
+
+# Window used when no start time is given
+DEFAULT_LOOKBACK_MS = 7 * 24 * 60 * 60 * 1000  # one week
+
+
+def resolve_window(
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    lookback_ms: int = DEFAULT_LOOKBACK_MS
+) -> Tuple[int, int]:
+    """
+    Fill in missing bounds of a time window.
+
+    Args:
+        start_time: Start time in milliseconds; defaults to `lookback_ms` before the end
+        end_time: End time in milliseconds; defaults to now
+        lookback_ms: Window length used when `start_time` is missing
+
+    Returns:
+        Tuple of (start_time, end_time) in integer milliseconds
+    """
+    if end_time is None:
+        end_time = _now_ms()
+    if start_time is None:
+        start_time = end_time - lookback_ms
+    return start_time, end_time
+
+
+def _now_ms() -> int:
+    """Current time in integer milliseconds, without going through a float."""
+    return time.time_ns() // 1_000_000
+
+
+def fetch_page(
+    session: requests.Session,
+    method: str,
+    url: str,
+    exchange: str,
+    **request_kwargs: Any
+) -> List[Dict]:
+    """
+    Request one page of funding history and return its decoded records.
+
+    Args:
+        session: Session to send the request with
+        method: HTTP method ('GET' or 'POST')
+        url: Endpoint URL
+        exchange: Exchange name, used in error messages
+        **request_kwargs: Extra arguments for `session.request` (params, json, headers)
+
+    Returns:
+        List of raw funding records
+    """
+    response = session.request(method, url, **request_kwargs)
+    if response.status_code != 200:
+        raise Exception(f"{exchange.capitalize()} API error: {response.status_code} {response.text}")
+    return _json.loads(response.content)
+
+
+def paginate(
+    session: requests.Session,
+    method: str,
+    url: str,
+    build_request: Callable[[int, int], Dict[str, Any]],
+    exchange: str,
+    symbol: str,
+    time_key: str,
+    page_limit: int,
+    start_time: int,
+    end_time: int,
+    settle_ms: int,
+    cache: Optional[FundingCache] = None,
+    empty_skip_ms: Optional[int] = None,
+    sleep_time: float = 0.2,
+    max_workers: int = 6
+) -> np.ndarray:
+    """
+    Fetch a funding history between two timestamps.
+
+    The first page is requested serially. If it is full, the funding interval
+    is estimated from its timestamps and the rest of the range is cut into
+    sub-windows expected to fit in one page each, which are fetched
+    concurrently. Each sub-window still paginates serially should the estimate
+    fall short. Transient HTTP failures are left to the session's retry
+    policy; an error that survives it ends the affected range.
+
+    Args:
+        session: Session to send requests with
+        method: HTTP method ('GET' or 'POST')
+        url: Endpoint URL
+        build_request: Callable mapping (page_start, page_end) to `session.request` kwargs
+        exchange: Exchange name, used for cache keys and error messages
+        symbol: Symbol or coin being fetched
+        time_key: Name of the millisecond timestamp field in each record
+        page_limit: Maximum number of records the endpoint returns per page
+        start_time: Start time in milliseconds
+        end_time: End time in milliseconds
+        settle_ms: Funding period; the most recent one is never marked as cached
+        cache: Optional FundingCache; only the uncached tail of the range is requested
+        empty_skip_ms: If set, an empty page advances the cursor by this much instead
+            of ending the range
+        sleep_time: Pause between consecutive pages of one range, in seconds
+        max_workers: Maximum number of sub-windows fetched at once
+
+    Returns:
+        Structured array of FUNDING_DTYPE (`time` in ms, `rate`), sorted by time
+    """
+    complete = True
+
+    def fetch_range(range_start: int, range_end: int, max_pages: Optional[int] = None):
+        nonlocal complete
+        # Columns are appended straight into typed buffers rather than kept as dicts.
+        times, rates = array("q"), array("d")
+        current_start = range_start
+        pages = 0
+        try:
+            while current_start <= range_end:
+                data = fetch_page(session, method, url, exchange, **build_request(current_start, range_end))
+                if not data and empty_skip_ms:
+                    current_start += empty_skip_ms
+                    continue
+                for record in data:
+                    times.append(int(record[time_key]))
+                    rates.append(float(record["fundingRate"]))
+                if cache is not None:
+                    cache.add_records(exchange, symbol, data, time_key)
+                pages += 1
+                # A short page means the range is exhausted.
+                if len(data) < page_limit or pages == max_pages:
+                    break
+                current_start = data[-1][time_key] + 1
+                time.sleep(sleep_time)
+        except Exception as e:
+            # Transient failures have already been retried by the session's adapter.
+            logger.warning("Error fetching %s funding history for %s: %s", exchange, symbol, e)
+            complete = False
+        return times, rates
+
+    current_start = start_time
+    if cache is not None:
+        current_start = cache.resume_from(exchange, symbol, start_time)
+
+    times, rates = fetch_range(current_start, end_time, max_pages=1)
+    if len(times) >= page_limit:
+        more_times, more_rates = _fetch_windows_concurrently(fetch_range, times, page_limit,
+                                                             end_time, max_workers)
+        times.extend(more_times)
+        rates.extend(more_rates)
+
+    if cache is not None:
+        if complete:
+            settled_end = min(end_time, _now_ms() - settle_ms)
+            cache.mark_covered(exchange, symbol, start_time, settled_end)
+        # Only the cached prefix is read back; fresh pages are already in the buffers.
+        # The covered window may reach past `end_time`, so the read stops there.
+        if current_start > start_time:
+            cached_times, cached_rates = cache.get_series(exchange, symbol, start_time,
+                                                          min(current_start - 1, end_time))
+            cached_times.extend(times)
+            cached_rates.extend(rates)
+            times, rates = cached_times, cached_rates
+    logger.debug("Fetched %d %s funding records for %s", len(times), exchange, symbol)
+    return _to_series(times, rates)
+
+
+def _fetch_windows_concurrently(fetch_range, first_times, page_limit, end_time, max_workers):
+    """
+    Fetch the rest of a range after its first full page without serial paging.
+    Returns (times, rates) arrays covering all sub-windows in time order.
+    """
+    first_time = first_times[0]
+    last_time = first_times[-1]
+    interval_ms = (last_time - first_time) // (len(first_times) - 1)
+    if interval_ms <= 0:
+        return fetch_range(last_time + 1, end_time)
+    # Leave headroom so irregularly spaced records still fit in a single page.
+    window_ms = (page_limit - page_limit // 10) * interval_ms
+    windows = [(start, min(start + window_ms - 1, end_time))
+               for start in range(last_time + 1, end_time + 1, window_ms)]
+    times, rates = array("q"), array("d")
+    if not windows:
+        return times, rates
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+        for window_times, window_rates in executor.map(lambda window: fetch_range(*window), windows):
+            times.extend(window_times)
+            rates.extend(window_rates)
+    return times, rates
+
+
+def _to_series(times: array, rates: array) -> np.ndarray:
+    """Pack typed time/rate buffers into a FUNDING_DTYPE array sorted by time."""
+    out = np.empty(len(times), dtype=FUNDING_DTYPE)
+    out["time"] = np.frombuffer(times, dtype=np.int64)
+    out["rate"] = np.frombuffer(rates, dtype=np.float64)
+    # Pages already arrive in time order, so only sort when that does not hold.
+    if not np.all(np.diff(out["time"]) >= 0):
+        out = out[np.argsort(out["time"], kind="stable")]
+    return out
@@ -0,0 +1,213 @@
+import json
+import os
+from array import array
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Repository root, so the default cache locations do not depend on the working directory
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class FundingCache:
+    """
+    SQLite-backed cache of historical funding records.
+
+    Settled funding records never change, so once a window has been fetched
+    only its tail needs to be requested again on later runs. Each
+    (exchange, symbol) pair tracks a single contiguous covered window.
+    """
+
+    def __init__(self, db_path: str = str(PROJECT_ROOT / "data" / "cache" / "funding.db")):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file; defaults to data/cache/funding.db
+                under the repository root
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # The fetchers run on worker threads, so share one connection behind a lock.
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS funding ("
+                "exchange TEXT NOT NULL, symbol TEXT NOT NULL, ts INTEGER NOT NULL, "
+                "rate REAL, raw TEXT, PRIMARY KEY (exchange, symbol, ts))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                "exchange TEXT NOT NULL, symbol TEXT NOT NULL, "
+                "start_ts INTEGER NOT NULL, end_ts INTEGER NOT NULL, "
+                "PRIMARY KEY (exchange, symbol))"
+            )
+
+    def get_coverage(self, exchange: str, symbol: str) -> Optional[Tuple[int, int]]:
+        """Return the (start_ts, end_ts) window known to be complete, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start_ts, end_ts FROM coverage WHERE exchange=? AND symbol=?",
+                (exchange, symbol)
+            ).fetchone()
+        return row
+
+    def resume_from(self, exchange: str, symbol: str, start_time: int) -> int:
+        """
+        Return the timestamp from which fetching must resume for a window
+        beginning at `start_time`, skipping whatever is already cached.
+        """
+        coverage = self.get_coverage(exchange, symbol)
+        if coverage is None:
+            return start_time
+        covered_start, covered_end = coverage
+        if covered_start <= start_time <= covered_end + 1:
+            return max(start_time, covered_end + 1)
+        return start_time
+
+    def add_records(self, exchange: str, symbol: str, records: List[Dict], time_key: str) -> None:
+        """
+        Store raw funding records, replacing any stored record with the same timestamp
+        so a re-fetched, now settled, value wins over the earlier one.
+
+        Args:
+            exchange: Exchange name (e.g., 'binance')
+            symbol: Symbol or coin the records belong to
+            records: Records as returned by the exchange API
+            time_key: Name of the millisecond timestamp field in each record
+        """
+        rows = [
+            (exchange, symbol, int(r[time_key]), float(r["fundingRate"]), json.dumps(r))
+            for r in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO funding (exchange, symbol, ts, rate, raw) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(exchange, symbol, ts) DO UPDATE SET rate=excluded.rate, raw=excluded.raw",
+                rows
+            )
+
+    def mark_covered(self, exchange: str, symbol: str, start_ts: int, end_ts: int) -> None:
+        """
+        Record that every funding record in [start_ts, end_ts] is cached.
+
+        The window is merged with the existing one when they touch; otherwise
+        it replaces it.
+        """
+        if end_ts < start_ts:
+            return
+        coverage = self.get_coverage(exchange, symbol)
+        if coverage is not None:
+            covered_start, covered_end = coverage
+            if start_ts <= covered_end + 1 and covered_start <= end_ts + 1:
+                start_ts = min(start_ts, covered_start)
+                end_ts = max(end_ts, covered_end)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO coverage (exchange, symbol, start_ts, end_ts) VALUES (?, ?, ?, ?)",
+                (exchange, symbol, start_ts, end_ts)
+            )
+
+    def get_records(self, exchange: str, symbol: str, start_ts: int, end_ts: int) -> List[Dict]:
+        """Return cached raw records with timestamps in [start_ts, end_ts], sorted by time."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT raw FROM funding WHERE exchange=? AND symbol=? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (exchange, symbol, start_ts, end_ts)
+            ).fetchall()
+        return [json.loads(raw) for (raw,) in rows]
+
+    def get_series(self, exchange: str, symbol: str, start_ts: int, end_ts: int) -> Tuple[array, array]:
+        """
+        Return cached timestamps and rates in [start_ts, end_ts] as typed
+        ('q', 'd') arrays sorted by time, without decoding the raw records.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, rate FROM funding WHERE exchange=? AND symbol=? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (exchange, symbol, start_ts, end_ts)
+            ).fetchall()
+        return array("q", (ts for ts, _ in rows)), array("d", (rate for _, rate in rows))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class KlineCache:
+    """
+    Parquet-backed cache of historical klines and archive snapshots.
+
+    Each (exchange, symbol, interval) triple is stored in one Parquet file
+    together with the single contiguous window it covers, kept in the file's
+    schema metadata; data that does not depend on the interval is keyed
+    without one. A repeated request is then served from disk and an
+    overlapping one only needs the part outside that window.
+    """
+
+    def __init__(self, cache_dir: str = str(PROJECT_ROOT / "data" / "cache" / "klines")):
+        """
+        Args:
+            cache_dir: Directory holding the Parquet files; defaults to data/cache/klines
+                under the repository root
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _cache_path(self, exchange: str, symbol: str, interval: Optional[str]) -> Path:
+        """Return the Parquet file backing one (exchange, symbol, interval) triple."""
+        if interval is None:
+            return self.cache_dir / f"{exchange}_{symbol}.parquet"
+        return self.cache_dir / f"{exchange}_{symbol}_{interval}.parquet"
+
+    def load(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: Optional[str]
+    ) -> Optional[Tuple[pd.DataFrame, int, int]]:
+        """
+        Read the cached frame and its covered window.
+
+        Returns:
+            Tuple of (data, start_ts, end_ts) with the window in milliseconds,
+            or None if nothing usable is cached
+        """
+        path = self._cache_path(exchange, symbol, interval)
+        if not path.exists():
+            return None
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        if b"start_ts" not in metadata or b"end_ts" not in metadata:
+            return None
+        return table.to_pandas(), int(metadata[b"start_ts"]), int(metadata[b"end_ts"])
+
+    def save(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: Optional[str],
+        df: pd.DataFrame,
+        start_ts: int,
+        end_ts: int
+    ) -> None:
+        """
+        Replace the cached frame with `df`, recorded as covering [start_ts, end_ts].
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"start_ts": str(start_ts).encode(),
+            b"end_ts": str(end_ts).encode()
+        })
+        path = self._cache_path(exchange, symbol, interval)
+        # Write next to the target and swap it in, so a crash never leaves a torn file.
+        tmp_path = path.with_suffix(".parquet.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
@@ -1,32 +1,271 @@
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+import logging
 import requests
+import threading
 import time
-from typing import Dict, List, Optional
-import boto3
-from botocore import UNSIGNED
-from botocore.client import Config
-import io
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
 import lz4.frame
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from typing import Optional
+from types import MappingProxyType
 
-class BinanceDataCollector():
-    """Data collector for Binance Futures."""
+from src.data._pagination import _json
 
-    BASE_URL = "https://fapi.binance.com"
-            
+logger = logging.getLogger(__name__)
+
+# Request counts and latencies per endpoint, for callers that want to watch or
+# tune concurrency. Updated by `_timed`.
+REQUEST_STATS: Dict[str, Dict[str, float]] = {
+    name: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+    for name in ("binance_klines", "s3_get_object")
+}
+_STATS_LOCK = threading.Lock()
+
+
+@contextmanager
+def _timed(name: str, label: str, *args):
+    """Record the duration of the block under REQUEST_STATS[name] and log it."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _STATS_LOCK:
+            stats = REQUEST_STATS[name]
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        logger.debug(label + " took %.3fs", *args, elapsed)
+
+
+# Shared by all Binance collectors so consecutive pages reuse a kept-alive connection.
+# Rate limiting (honouring Retry-After) and transient server errors are retried by the adapter.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+))
+
+# Archive files are public, so they are downloaded straight from the bucket's HTTPS
+# endpoint over one pool shared by all download threads, without boto3's per-call
+# request/response machinery.
+_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=64,
+    # Same limits as botocore's defaults, so a stalled connection cannot hang a download thread.
+    timeout=urllib3.Timeout(connect=60, read=60),
+    retries=Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+)
+
+# Binance Futures request weight budget per IP.
+BINANCE_WEIGHT_PER_MINUTE = 2400
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def sync(self, used: float) -> None:
+        """Cap the available tokens at what the server reports as still unused."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, self.capacity - used)
+
+
+# Shared by all Binance collectors, as the weight limit applies to the whole IP.
+_BINANCE_WEIGHT = TokenBucket(rate=BINANCE_WEIGHT_PER_MINUTE / 60, capacity=BINANCE_WEIGHT_PER_MINUTE)
+
+
+def _klines_weight(limit: int) -> int:
+    """Request weight Binance charges for a klines call returning up to `limit` rows."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+# Supported kline intervals in minutes (1M is taken as its longest, 31-day, month).
+# Read-only and built once at import instead of on every call.
+_INTERVAL_MINUTES = MappingProxyType({
+    '1m': 1, '3m': 3, '5m': 5, '15m': 15, '30m': 30,
+    '1h': 60, '2h': 120, '4h': 240, '6h': 360, '8h': 480, '12h': 720,
+    '1d': 1440, '3d': 4320, '1w': 10080, '1M': 44640
+})
+
+
+def _validate_interval(interval: str) -> int:
+    """Return the length of `interval` in minutes, raising ValueError if unsupported."""
+    minutes = _INTERVAL_MINUTES.get(interval)
+    if minutes is None:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return minutes
+
+
+def _page_arrays(data: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert one page of raw klines into typed arrays.
+
+    Each row is [open_time, open, high, low, close, volume, close_time, ...], so the
+    page is transposed once and only the needed columns are converted.
+
+    Returns:
+        Tuple of (open times in ms as int64, float64 prices of shape (5, rows)
+        holding open, high, low, close and volume)
+    """
+    columns = list(zip(*data))
+    timestamps = np.fromiter(columns[0], dtype=np.int64, count=len(data))
+    prices = np.array(columns[1:6], dtype=np.float64)
+    return timestamps, prices
+
+
+class BaseDataCollector(ABC):
+    """Base class for historical data collectors."""
+
+    # Requests a collector makes at once; subclasses set their own in __init__.
+    max_workers: int = 8
+
+    @abstractmethod
     def get_historical_perpetual_klines(
         self,
         symbol: str,
         interval: str,
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
-        limit: int = 100
+        limit: int = 100,
+        max_workers: Optional[int] = None
     ) -> pd.DataFrame:
         """
-        Get historical kline data from Binance Futures by looping over pages
-        to avoid rate limits.
+        Get historical perpetual market data for a symbol.
+
+        Args:
+            symbol: Symbol in the exchange's format
+            interval: Time interval (e.g., '1h')
+            start_time: Start time in milliseconds
+            end_time: End time in milliseconds
+            limit: Number of records per API call, where the exchange paginates
+            max_workers: Maximum number of requests made at once; defaults to the
+                collector's `max_workers`
+
+        Returns:
+            DataFrame with the historical data. `df.attrs["complete"]` is False when
+            part of the range could not be fetched and the frame may have gaps.
+        """
+        pass
+
+    def get_many_perpetual_klines(
+        self,
+        symbols: List[str],
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        max_workers: int = 8
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch several symbols concurrently.
+
+        Each symbol's fetch is network bound, so running them on a thread pool
+        makes the total wall time close to that of the slowest symbol. The
+        collector's `max_workers` is the budget for all of them together: it is
+        split between the symbols fetched at once, so the nested pools never open
+        more connections than the shared HTTP pools keep.
+
+        Args:
+            symbols: Symbols in the exchange's format
+            interval: Time interval (e.g., '1h')
+            start_time: Start time in milliseconds
+            end_time: End time in milliseconds
+            max_workers: Maximum number of symbols fetched at once
+
+        Returns:
+            Dictionary mapping each symbol to its DataFrame
+        """
+        if not symbols:
+            return {}
+        workers = min(max_workers, len(symbols))
+        workers_per_symbol = max(1, self.max_workers // workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = executor.map(
+                lambda symbol: self.get_historical_perpetual_klines(
+                    symbol, interval, start_time, end_time, max_workers=workers_per_symbol
+                ),
+                symbols
+            )
+            return dict(zip(symbols, frames))
+
+
+class BinanceDataCollector(BaseDataCollector):
+    """Data collector for Binance Futures."""
+
+    BASE_URL = "https://fapi.binance.com"
+
+    def __init__(self, max_workers: int = 8):
+        """
+        Args:
+            max_workers: Maximum number of time windows fetched at once
+        """
+        self.max_workers = max_workers
+
+    def _fetch_range(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        limit: int,
+        max_pages: Optional[int] = None
+    ) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], bool]:
+        """
+        Page through the klines of one time range.
 
         Args:
             symbol: Trading pair symbol (e.g., 'BTCUSDT')
@@ -34,12 +273,15 @@ class BinanceDataCollector():
             start_time: Start time in milliseconds
             end_time: End time in milliseconds
             limit: Number of records per API call (max 1000)
+            max_pages: Optional cap on the number of pages requested
 
         Returns:
-            DataFrame with columns: [timestamp, open, high, low, close, volume]
+            Tuple of (pages, complete): the (timestamps, prices) pages in time order, as
+            returned by `_page_arrays`, and whether the range was fetched without error
         """
         endpoint = f"{self.BASE_URL}/fapi/v1/continuousKlines"
-        all_data = []
+        weight = _klines_weight(limit)
+        pages = []
         current_start = start_time
 
         while True:
@@ -55,56 +297,109 @@ class BinanceDataCollector():
                 params["endTime"] = end_time
 
             try:
-                response = requests.get(endpoint, params=params)
-                # If rate limited, wait before retrying
-                if response.status_code == 429:
-                    print("Rate limit hit, sleeping for 60 seconds...")
-                    time.sleep(60)
-                    continue
-
+                # Pace pages by the weight budget instead of a fixed pause; 429s that
+                # still happen are retried by the session adapter after Retry-After.
+                _BINANCE_WEIGHT.acquire(weight)
+                with _timed("binance_klines", "Binance klines request for %s from %s", symbol, current_start):
+                    response = _SESSION.get(endpoint, params=params, timeout=(3, 10))
+                used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+                if used_weight is not None:
+                    _BINANCE_WEIGHT.sync(int(used_weight))
                 response.raise_for_status()
-                data = response.json()
+                data = _json.loads(response.content)
 
                 # If no more data is returned, break out of the loop.
                 if not data:
                     break
 
-                all_data.extend(data)
+                # Convert each page as it arrives, so the raw rows are not kept around.
+                pages.append(_page_arrays(data))
 
                 # Last returned timestamp (assumed to be in the first column)
                 last_timestamp = data[-1][0]
 
                 # If we reached or passed the end time, or if fewer than `limit` entries were returned,
                 # we assume we've fetched all the data.
-                if (end_time and last_timestamp >= end_time) or len(data) < limit:
+                if (end_time and last_timestamp >= end_time) or len(data) < limit or len(pages) == max_pages:
                     break
 
                 # Set the next start time (avoid duplicate data by adding 1 ms)
                 current_start = last_timestamp + 1
 
-                # Pause briefly to reduce request frequency.
-                time.sleep(0.5)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # The JSON decoders report a malformed body as a ValueError.
+                logger.warning("Error fetching data from Binance: %s", e)
+                return pages, False
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching data from Binance: {e}")
-                break
+        return pages, True
+
+    def get_historical_perpetual_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = 100,
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Get historical kline data from Binance Futures, fetching the pages of a
+        bounded range concurrently while staying within the rate limits.
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            interval: Kline interval (e.g., '1h', '4h', '1d')
+            start_time: Start time in milliseconds
+            end_time: End time in milliseconds
+            limit: Number of records per API call (max 1000)
+            max_workers: Maximum number of windows fetched at once; defaults to
+                `self.max_workers`
 
-        # Convert accumulated data to a DataFrame.
-        df = pd.DataFrame(all_data, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades_count',
-            'taker_buy_volume', 'taker_buy_quote_volume', 'ignore'
-        ])
+        Returns:
+            DataFrame with columns: [timestamp, open, high, low, close, volume];
+            `df.attrs["complete"]` is False if any page failed
+        """
+        # Fail fast instead of letting every page request be rejected by the API.
+        interval_minutes = _validate_interval(interval)
 
-        # Convert timestamp to datetime and numeric columns to float.
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-        df[numeric_columns] = df[numeric_columns].astype(float)
+        # Every interval but '1M' has a fixed candle stride, so a bounded range can be
+        # cut up front into windows of at most `limit` candles each, and the windows
+        # fetched concurrently instead of page after page.
+        if start_time is not None and end_time is not None and interval != '1M':
+            window_ms = limit * interval_minutes * 60_000
+            windows = [(window_start, min(window_start + window_ms - 1, end_time))
+                       for window_start in range(start_time, end_time + 1, window_ms)]
+            workers = max_workers or self.max_workers
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(windows)))) as executor:
+                # map() keeps the windows, and so the rows, in time order.
+                results = list(executor.map(
+                    lambda window: self._fetch_range(symbol, interval, window[0], window[1], limit, max_pages=1),
+                    windows
+                ))
+            pages = [page for window_pages, _ in results for page in window_pages]
+            complete = all(window_complete for _, window_complete in results)
+        else:
+            pages, complete = self._fetch_range(symbol, interval, start_time, end_time, limit)
 
-        return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+        # Gaps in the exchange's history make the exact row count known only once
+        # every page is in, so size the buffers then and copy each page into place.
+        # Prices are laid out one row per column, so every column of the frame is a
+        # contiguous float64 buffer shared with `prices`.
+        total = sum(len(page_timestamps) for page_timestamps, _ in pages)
+        timestamps = np.empty(total, dtype=np.int64)
+        prices = np.empty((5, total), dtype=np.float64)
+        offset = 0
+        for page_timestamps, page_prices in pages:
+            timestamps[offset:offset + len(page_timestamps)] = page_timestamps
+            prices[:, offset:offset + len(page_timestamps)] = page_prices
+            offset += len(page_timestamps)
+        df = pd.DataFrame(prices.T, columns=['open', 'high', 'low', 'close', 'volume'], copy=False)
+        df.insert(0, 'timestamp', pd.to_datetime(timestamps, unit='ms'))
+        df.attrs["complete"] = complete
+        return df
 
 
-class HyperliquidDataCollector():
+class HyperliquidDataCollector(BaseDataCollector):
     """
     Data collector for Hyperliquid's historical perpetual data.
     Since Hyperliquid does not offer this data via their API, we fetch from
@@ -113,18 +408,107 @@ class HyperliquidDataCollector():
     
     S3_BUCKET = "hyperliquid-archive"
     S3_PREFIX = "market_data"  # data is stored under market_data/YYYYMMDD/HH/l2Book/<coin>.lz4
+    S3_URL = f"https://{S3_BUCKET}.s3.amazonaws.com"
+
+    def __init__(self, max_workers: int = 32):
+        """
+        Args:
+            max_workers: Maximum number of hourly files downloaded at once
+        """
+        self.max_workers = max_workers
+
+    def _fetch_hour(
+        self,
+        s3_key: str,
+        start_ts: Optional[pa.TimestampScalar] = None,
+        end_ts: Optional[pa.TimestampScalar] = None
+    ) -> Tuple[Optional[pa.Table], bool]:
+        """
+        Download, decompress and parse one hourly archive file.
+
+        Args:
+            s3_key: Key of the hourly L2 book file
+            start_ts: If given, drop rows timestamped before it
+            end_ts: If given, drop rows timestamped after it
+
+        Returns:
+            Tuple of (table, ok): the Arrow table with the file's rows, or None if it is
+            missing or unreadable, and False only if the download or parse failed
+        """
+        try:
+            # The body is streamed while it is parsed, so time the whole download.
+            with _timed("s3_get_object", "S3 download of %s", s3_key):
+                response = _HTTP.request("GET", f"{self.S3_URL}/{quote(s3_key)}", preload_content=False)
+                try:
+                    if response.status != 200:
+                        # S3 answers with a short XML error document; only NoSuchKey means
+                        # the hour is absent. Any other refusal (AccessDenied, requester
+                        # pays, a redirect) is an error, not an empty hour.
+                        body = response.read()
+                        if response.status == 404 or b"<Code>NoSuchKey</Code>" in body:
+                            logger.debug("No data found for S3 key: %s", s3_key)
+                            return None, True
+                        raise Exception(f"S3 error: {response.status} {response.reason} {body[:200]!r}")
+                    # Decompress the LZ4 frames as they come off the S3 stream, so neither
+                    # the compressed nor the decompressed hour is buffered in full.
+                    with lz4.frame.LZ4FrameFile(response, mode="rb") as stream:
+                        # Assume the decompressed file is in CSV format. Arrow's reader tokenizes
+                        # in parallel and hands numeric columns to pandas without re-parsing.
+                        table = pacsv.read_csv(
+                            stream,
+                            read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20)
+                        )
+                finally:
+                    response.release_conn()
+            table = self._normalize_timestamp(table)
+            # Trim the boundary hours here, before any rows are copied into pandas.
+            if "timestamp" in table.column_names and pa.types.is_timestamp(table.schema.field("timestamp").type):
+                timestamps = table.column("timestamp")
+                if start_ts is not None:
+                    table = table.filter(pc.greater_equal(timestamps, start_ts))
+                    timestamps = table.column("timestamp")
+                if end_ts is not None:
+                    table = table.filter(pc.less_equal(timestamps, end_ts))
 
-    def __init__(self):
-        # Create an S3 client that does unsigned (public) requests.
-        self.s3_client = boto3.client("s3", config=Config(signature_version=UNSIGNED))
+            logger.debug("Fetched data from S3 key: %s", s3_key)
+            return table, True
+        except Exception as e:
+            logger.warning("Error fetching data for S3 key %s: %s", s3_key, e)
+        return None, False
     
+    @staticmethod
+    def _normalize_timestamp(table: pa.Table) -> pa.Table:
+        """
+        Convert a numeric epoch `timestamp` column, if present, to an Arrow
+        timestamp so it reaches pandas as datetimes.
+        """
+        if "timestamp" not in table.column_names:
+            return table
+        index = table.schema.get_field_index("timestamp")
+        column = table.column(index)
+        if len(column) == 0 or not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            return table
+        # One value is enough to tell the unit, so avoid scanning the whole column.
+        sample = column[0].as_py()
+        if sample is None:
+            sample = pc.max(column).as_py()
+        # If timestamps appear to be in seconds, convert them to datetime.
+        unit = 's' if sample < 1e12 else 'ms'
+        if pa.types.is_floating(column.type):
+            # Fractional epochs are rounded to whole milliseconds first.
+            column = pc.round(pc.multiply(column, 1000 if unit == 's' else 1))
+            column = pc.cast(column, pa.int64())
+            unit = 'ms'
+        return table.set_column(index, "timestamp", pc.cast(column, pa.timestamp(unit)))
+
     def get_historical_perpetual_klines(
         self,
         symbol: str,
         interval: str,  # not used for retrieval; could be used later for aggregation
         start_time: Optional[int] = None,
         end_time: Optional[int] = None,
-        limit: int = 500  # not used here
+        limit: int = 500,  # not used here
+        max_workers: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Fetch historical L2 book snapshots for a given coin from Hyperliquid's S3 archive.
@@ -135,9 +519,12 @@ class HyperliquidDataCollector():
             start_time: Start time in milliseconds.
             end_time: End time in milliseconds.
             limit: Not used in this implementation.
+            max_workers: Maximum number of hourly files downloaded at once; defaults
+                to `self.max_workers`.
             
         Returns:
-            A pandas DataFrame with the combined data from each available hourly file.
+            A pandas DataFrame with the combined data from each available hourly file;
+            `df.attrs["complete"]` is False if any hour failed to download or parse.
         """
         if start_time is None or end_time is None:
             raise ValueError("start_time and end_time must be provided in milliseconds")
@@ -146,57 +533,45 @@ class HyperliquidDataCollector():
         start_dt = datetime.fromtimestamp(start_time / 1000)
         end_dt = datetime.fromtimestamp(end_time / 1000)
         
-        current_dt = start_dt
-        data_frames = []
-        
-        # Iterate over each hour in the requested time range.
-        while current_dt <= end_dt:
-            date_str = current_dt.strftime("%Y%m%d")
-            hour_str = current_dt.strftime("%H")
-            # Build the S3 key for this hour's L2 book data.
-            s3_key = f"{self.S3_PREFIX}/{date_str}/{hour_str}/l2Book/{symbol}.lz4"
-            
-            try:
-                response = self.s3_client.get_object(Bucket=self.S3_BUCKET, Key=s3_key)
-                compressed_data = response["Body"].read()
-                # Decompress the LZ4 file.
-                decompressed_data = lz4.frame.decompress(compressed_data)
-                # Assume the decompressed file is in CSV format.
-                df_hour = pd.read_csv(io.BytesIO(decompressed_data))
-                
-                # Optionally convert a timestamp column if it exists.
-                if "timestamp" in df_hour.columns:
-                    # If timestamps appear to be in seconds, convert them to datetime.
-                    if df_hour["timestamp"].max() < 1e12:
-                        df_hour["timestamp"] = pd.to_datetime(df_hour["timestamp"], unit='s')
-                    else:
-                        df_hour["timestamp"] = pd.to_datetime(df_hour["timestamp"], unit='ms')
-    
-                data_frames.append(df_hour)
-                print(f"Fetched data from S3 key: {s3_key}")
-            except self.s3_client.exceptions.NoSuchKey:
-                print(f"No data found for S3 key: {s3_key}")
-            except Exception as e:
-                print(f"Error fetching data for S3 key {s3_key}: {e}")
-            
-            # Move to the next hour.
-            current_dt += timedelta(hours=1)
-        
-        if data_frames:
-            full_df = pd.concat(data_frames, ignore_index=True)
-            # Optional: Filter rows to ensure timestamps lie within the requested range.
-            if "timestamp" in full_df.columns:
-                full_df = full_df[
-                    (full_df["timestamp"] >= pd.to_datetime(start_time, unit='ms')) &
-                    (full_df["timestamp"] <= pd.to_datetime(end_time, unit='ms'))
-                ]
-            return full_df
+        # Build the S3 key of every hour in the requested time range up front.
+        # A missing hour is just a cheap NoSuchKey response, so no listing is done first.
+        hours = pd.date_range(start_dt, end_dt, freq='h')
+        s3_keys = [
+            f"{self.S3_PREFIX}/{date_str}/{hour_str}/l2Book/{symbol}.lz4"
+            for date_str, hour_str in zip(hours.strftime("%Y%m%d"), hours.strftime("%H"))
+        ]
+
+        # Each download is dominated by network latency, so fetch the hours
+        # concurrently; map() keeps the results in hour order.
+        workers = max_workers or self.max_workers
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(s3_keys)))) as executor:
+            # Each hour is trimmed to the requested range before it is returned; the
+            # boundaries are converted once and shared by every hour.
+            start_ts = pa.scalar(start_time, pa.timestamp('ms'))
+            end_ts = pa.scalar(end_time, pa.timestamp('ms'))
+            results = list(executor.map(lambda s3_key: self._fetch_hour(s3_key, start_ts, end_ts), s3_keys))
+        tables = [table for table, _ in results if table is not None]
+
+        if tables:
+            # Hours stay as Arrow tables until here, so the rows are copied into
+            # pandas once; columns missing from some hours are filled with nulls.
+            full_table = pa.concat_tables(tables, promote_options="permissive")
+            df = full_table.to_pandas(split_blocks=True, self_destruct=True)
         else:
-            return pd.DataFrame()
+            df = pd.DataFrame()
+        # Hours that are simply absent from the archive do not make the result incomplete.
+        df.attrs["complete"] = all(ok for _, ok in results)
+        return df
     
     
+@lru_cache(maxsize=None)
 def get_collector(exchange: str):
-    """Factory function to get the appropriate data collector."""
+    """
+    Factory function to get the appropriate data collector.
+
+    Collectors only hold clients and settings, so one instance per exchange is
+    created and shared for the life of the process.
+    """
     collectors = {
         'binance': BinanceDataCollector,
         'hyperliquid': HyperliquidDataCollector
@@ -1,6 +1,10 @@
+import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
 import pandas as pd
 from pathlib import Path
 
@@ -8,13 +12,133 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
+from src.data.cache import KlineCache
 from src.data.collectors import get_collector
 
+# Data younger than this may still be revised or not yet archived, so it is never cached.
+SETTLE_MS = 24 * 60 * 60 * 1000  # one day
+
+
+def _slice(df: pd.DataFrame, start_time: int, end_time: int) -> pd.DataFrame:
+    """Keep the rows whose timestamp lies in [start_time, end_time] (milliseconds)."""
+    timestamps = df["timestamp"]
+    mask = (timestamps >= pd.to_datetime(start_time, unit='ms')) & (timestamps <= pd.to_datetime(end_time, unit='ms'))
+    return df[mask].reset_index(drop=True)
+
+
+def _is_complete(df: pd.DataFrame) -> bool:
+    """
+    Whether a fetched frame can be recorded as covering its whole range.
+
+    Collectors flag partial results in `df.attrs["complete"]`; an empty frame may
+    also be a silent failure, so it never counts as complete.
+    """
+    return len(df) > 0 and "timestamp" in df.columns and df.attrs.get("complete", True)
+
+
+def _fetch_with_cache(
+    collector,
+    exchange: str,
+    symbol: str,
+    interval: str,
+    start_time: int,
+    end_time: int,
+    cache: Optional[KlineCache] = None,
+    keyed_by_interval: bool = True
+) -> pd.DataFrame:
+    """
+    Fetch a time range through a collector, downloading only what the cache
+    does not already cover.
+
+    Args:
+        collector: Collector to fetch missing data with
+        exchange: Exchange name, used as part of the cache key
+        symbol: Symbol passed to the collector
+        interval: Time interval
+        start_time: Start time in milliseconds
+        end_time: End time in milliseconds
+        cache: Optional KlineCache
+        keyed_by_interval: Whether the fetched data depends on `interval`; if not,
+            every interval shares one cache entry
+
+    Returns:
+        DataFrame covering the requested range
+    """
+    def fetch(range_start: int, range_end: int) -> pd.DataFrame:
+        return collector.get_historical_perpetual_klines(
+            symbol=symbol,
+            interval=interval,
+            start_time=range_start,
+            end_time=range_end
+        )
+
+    if cache is None:
+        return fetch(start_time, end_time)
+
+    cache_interval = interval if keyed_by_interval else None
+    cached = cache.load(exchange, symbol, cache_interval)
+    if cached is not None:
+        cached_df, covered_start, covered_end = cached
+        if covered_start <= end_time + 1 and start_time <= covered_end + 1:
+            # Overlapping or adjacent: only fetch the pieces on either side of the window.
+            # A piece that is not complete is still returned, but the window is only
+            # extended over pieces that are.
+            pieces = [cached_df]
+            complete = True
+            extended = False
+            if start_time < covered_start:
+                head = fetch(start_time, covered_start - 1)
+                complete = complete and head.attrs.get("complete", True)
+                if len(head) > 0 and "timestamp" in head.columns:
+                    pieces.insert(0, head)
+                if _is_complete(head):
+                    covered_start = start_time
+                    extended = True
+            if end_time > covered_end:
+                tail = fetch(covered_end + 1, end_time)
+                complete = complete and tail.attrs.get("complete", True)
+                if len(tail) > 0 and "timestamp" in tail.columns:
+                    pieces.append(tail)
+                if _is_complete(tail):
+                    covered_end = end_time
+                    extended = True
+            df = pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else cached_df
+            if extended:
+                settled_end = min(covered_end, time.time_ns() // 1_000_000 - SETTLE_MS)
+                cache.save(exchange, symbol, cache_interval, _slice(df, covered_start, settled_end),
+                           covered_start, settled_end)
+            df = _slice(df, start_time, end_time)
+            df.attrs["complete"] = complete
+            return df
+
+    df = fetch(start_time, end_time)
+    settled_end = min(end_time, time.time_ns() // 1_000_000 - SETTLE_MS)
+    # Only one contiguous window is cached, so a range disjoint from it is returned
+    # without replacing the window already on disk.
+    if cached is None and _is_complete(df) and settled_end >= start_time:
+        cache.save(exchange, symbol, cache_interval, _slice(df, start_time, settled_end), start_time, settled_end)
+    return df
+
+
+def read_cached(path: str) -> pd.DataFrame:
+    """
+    Load a data file written by `fetch_historical_data`.
+
+    Args:
+        path: Path to a saved .parquet file
+
+    Returns:
+        DataFrame with the saved columns and dtypes
+    """
+    return pd.read_parquet(path, engine='pyarrow')
+
+
 def fetch_historical_data(
     symbol: str,
     interval: str = '1h',
     days: int = 30,
-    save_path: str = None
+    save_path: str = None,
+    cache: Optional[KlineCache] = None
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Fetch historical data from both Binance and Hyperliquid.
@@ -23,7 +147,8 @@ def fetch_historical_data(
         symbol: Trading pair symbol (e.g., 'BTC' for Hyperliquid, 'BTCUSDT' for Binance)
         interval: Time interval (e.g., '1h', '4h', '1d')
         days: Number of days of historical data to fetch
-        save_path: Optional path to save the data
+        save_path: Optional directory to save the data to, as Zstd-compressed Parquet
+        cache: Optional KlineCache; only ranges it does not cover are downloaded
         
     Returns:
         Tuple of (binance_df, hyperliquid_df)
@@ -51,19 +176,20 @@ def fetch_historical_data(
     print(f"Fetching {days} days of {interval} data for {symbol}...")
     
     binance_symbol = f"{symbol}USDT"  # Binance uses USDT pairs
-    binance_df = binance_collector.get_historical_perpetual_klines(
-        symbol=binance_symbol,
-        interval=interval,
-        start_time=start_time,
-        end_time=end_time
-    )
-    
-    hyperliquid_df = hyperliquid_collector.get_historical_perpetual_klines(
-        symbol=symbol,
-        interval=interval,
-        start_time=start_time,
-        end_time=end_time
-    )
+    # The two exchanges are independent, so fetch them side by side.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        binance_future = executor.submit(
+            _fetch_with_cache,
+            binance_collector, 'binance', binance_symbol, interval, start_time, end_time, cache
+        )
+        # Hyperliquid archive snapshots are the same whatever the interval.
+        hyperliquid_future = executor.submit(
+            _fetch_with_cache,
+            hyperliquid_collector, 'hyperliquid', symbol, interval, start_time, end_time, cache,
+            keyed_by_interval=False
+        )
+        binance_df = binance_future.result()
+        hyperliquid_df = hyperliquid_future.result()
 
     
     print(f"Fetched {len(binance_df)} records from Binance")
@@ -77,18 +203,23 @@ def fetch_historical_data(
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if len(binance_df) > 0:
-            binance_file = save_dir / f"binance_{symbol}_{interval}.csv"
-            binance_df.to_csv(binance_file, index=False)
+            binance_file = save_dir / f"binance_{symbol}_{interval}.parquet"
+            binance_df.to_parquet(binance_file, engine='pyarrow', compression='zstd',
+                                  compression_level=3, index=False)
             print(f"Binance data saved to {binance_file}")
             
         if len(hyperliquid_df) > 0:
-            hyperliquid_file = save_dir / f"hyperliquid_{symbol}_{interval}.csv"
-            hyperliquid_df.to_csv(hyperliquid_file, index=False)
+            hyperliquid_file = save_dir / f"hyperliquid_{symbol}_{interval}.parquet"
+            hyperliquid_df.to_parquet(hyperliquid_file, engine='pyarrow', compression='zstd',
+                                      compression_level=3, index=False)
             print(f"Hyperliquid data saved to {hyperliquid_file}")
     
     return binance_df, hyperliquid_df
 
 if __name__ == "__main__":
+    # Show collector warnings (and timings, at DEBUG) on the console.
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+
     # Example usage
     symbol = "BTC"
     interval = "1h"
@@ -99,7 +230,8 @@ if __name__ == "__main__":
         symbol=symbol,
         interval=interval,
         days=days,
-        save_path=save_path
+        save_path=save_path,
+        cache=KlineCache()
     )
     
     # Print some statistics
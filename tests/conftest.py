@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Make the `src` package importable when pytest is run from the project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
@@ -0,0 +1,40 @@
+from src.data.cache import FundingCache
+
+
+def make_cache(tmp_path):
+    return FundingCache(str(tmp_path / "funding.db"))
+
+
+def records(*pairs):
+    return [{"fundingTime": ts, "fundingRate": str(rate)} for ts, rate in pairs]
+
+
+def test_refetched_record_replaces_stored_value(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.add_records("binance", "BTCUSDT", records((1000, 0.0001), (2000, 0.0002)), "fundingTime")
+    cache.add_records("binance", "BTCUSDT", records((2000, 0.0005)), "fundingTime")
+
+    times, rates = cache.get_series("binance", "BTCUSDT", 0, 3000)
+    assert list(times) == [1000, 2000]
+    assert list(rates) == [0.0001, 0.0005]
+    assert cache.get_records("binance", "BTCUSDT", 2000, 2000) == [{"fundingTime": 2000, "fundingRate": "0.0005"}]
+    cache.close()
+
+
+def test_coverage_merges_adjacent_windows_and_resumes_after_them(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.mark_covered("binance", "BTCUSDT", 1000, 1999)
+    cache.mark_covered("binance", "BTCUSDT", 2000, 2999)
+    assert cache.get_coverage("binance", "BTCUSDT") == (1000, 2999)
+    assert cache.resume_from("binance", "BTCUSDT", 1500) == 3000
+    # A window starting outside the covered one is fetched from its own start.
+    assert cache.resume_from("binance", "BTCUSDT", 500) == 500
+    cache.close()
+
+
+def test_disjoint_window_replaces_coverage(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.mark_covered("binance", "BTCUSDT", 1000, 1999)
+    cache.mark_covered("binance", "BTCUSDT", 5000, 5999)
+    assert cache.get_coverage("binance", "BTCUSDT") == (5000, 5999)
+    cache.close()
@@ -0,0 +1,93 @@
+import io
+import threading
+import time
+from datetime import datetime, timezone
+
+import lz4.frame
+import urllib3
+
+import src.data.collectors as collectors
+
+HOUR_MS = 60 * 60 * 1000
+START = 1_693_526_400_000  # 2023-09-01
+
+
+def s3_error(status, code):
+    body = f"<?xml version=\"1.0\"?><Error><Code>{code}</Code></Error>".encode()
+    return urllib3.HTTPResponse(body=io.BytesIO(body), status=status, preload_content=False)
+
+
+class FakeHTTP:
+    """Serves one CSV row per hour, except for hours listed in `errors`."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+
+    def request(self, method, url, preload_content=True, **kwargs):
+        hour = url.split("/market_data/")[1].split("/")[1]
+        if hour in self.errors:
+            return s3_error(*self.errors[hour])
+        ts = START + int(hour) * HOUR_MS
+        body = lz4.frame.compress(f"timestamp,px\n{ts},1.5\n".encode())
+        return urllib3.HTTPResponse(body=io.BytesIO(body), status=200, preload_content=False)
+
+
+class UTCDatetime(datetime):
+    @classmethod
+    def fromtimestamp(cls, t, tz=None):
+        return datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None)
+
+
+def fetch(monkeypatch, http, interval="1h"):
+    monkeypatch.setattr(collectors, "_HTTP", http)
+    collector = collectors.HyperliquidDataCollector(max_workers=4)
+    # Hours are keyed in local time; pin it so the fake server can parse them.
+    monkeypatch.setattr(collectors, "datetime", UTCDatetime)
+    return collector.get_historical_perpetual_klines("BTC", interval, START, START + 5 * HOUR_MS)
+
+
+def test_missing_hours_keep_the_result_complete(monkeypatch):
+    df = fetch(monkeypatch, FakeHTTP({"02": (404, "NoSuchKey"), "03": (403, "NoSuchKey")}))
+    assert len(df) == 4
+    assert df.attrs["complete"] is True
+
+
+def test_access_denied_marks_the_result_incomplete(monkeypatch):
+    denied = {f"{hour:02d}": (403, "AccessDenied") for hour in range(6)}
+    df = fetch(monkeypatch, FakeHTTP(denied))
+    assert len(df) == 0
+    assert df.attrs["complete"] is False
+
+
+def test_interval_is_not_validated(monkeypatch):
+    # Snapshots are fetched per hour whatever the interval, so any value is accepted.
+    df = fetch(monkeypatch, FakeHTTP(), interval="90m")
+    assert len(df) == 6
+
+
+class CountingHTTP(FakeHTTP):
+    """Records the largest number of requests in flight at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return super().request(method, url, **kwargs)
+
+
+def test_many_symbols_share_one_worker_budget(monkeypatch):
+    http = CountingHTTP()
+    monkeypatch.setattr(collectors, "_HTTP", http)
+    monkeypatch.setattr(collectors, "datetime", UTCDatetime)
+    collector = collectors.HyperliquidDataCollector(max_workers=4)
+    frames = collector.get_many_perpetual_klines(["BTC", "ETH"], "1h", START, START + 5 * HOUR_MS, max_workers=2)
+    assert [len(df) for df in frames.values()] == [6, 6]
+    assert http.peak <= 4
@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pandas as pd
+import requests
+
+import src.data.collectors as collectors
+from src.data.cache import KlineCache
+from src.data.fetch_historical_data import _fetch_with_cache
+
+HOUR_MS = 60 * 60 * 1000
+START = 1_693_526_400_000  # 2023-09-01, long settled
+
+
+class FakeCollector:
+    """Returns one row per hour; the first `failures` calls lose their middle rows."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def get_historical_perpetual_klines(self, symbol, interval, start_time=None, end_time=None):
+        self.calls.append((start_time, end_time))
+        ts = np.arange(-(-start_time // HOUR_MS) * HOUR_MS, end_time + 1, HOUR_MS)
+        df = pd.DataFrame({"timestamp": pd.to_datetime(ts, unit="ms"), "close": ts / 1e9})
+        df.attrs["complete"] = True
+        if self.failures:
+            self.failures -= 1
+            df = df.drop(index=range(len(df) // 3, 2 * len(df) // 3)).reset_index(drop=True)
+            df.attrs["complete"] = False
+        return df
+
+
+def test_complete_fetch_is_cached_and_served(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    collector = FakeCollector()
+    full = _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 48 * HOUR_MS, cache)
+    assert len(full) == 49
+
+    collector.calls.clear()
+    part = _fetch_with_cache(collector, "binance", "BTCUSDT", "1h",
+                             START + 10 * HOUR_MS, START + 20 * HOUR_MS, cache)
+    assert collector.calls == []
+    assert len(part) == 11
+
+
+def test_incomplete_fetch_is_not_cached(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    collector = FakeCollector(failures=1)
+    partial = _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 48 * HOUR_MS, cache)
+    assert len(partial) < 49
+    assert cache.load("binance", "BTCUSDT", "1h") is None
+
+    again = _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 48 * HOUR_MS, cache)
+    assert len(again) == 49
+
+
+def test_incomplete_tail_does_not_extend_coverage(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    collector = FakeCollector()
+    _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 48 * HOUR_MS, cache)
+
+    collector.failures = 1
+    _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 96 * HOUR_MS, cache)
+    assert cache.load("binance", "BTCUSDT", "1h")[2] == START + 48 * HOUR_MS
+
+
+def test_disjoint_fetch_keeps_cached_window(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    collector = FakeCollector()
+    _fetch_with_cache(collector, "binance", "BTCUSDT", "1h", START, START + 48 * HOUR_MS, cache)
+
+    later = _fetch_with_cache(collector, "binance", "BTCUSDT", "1h",
+                              START + 100 * HOUR_MS, START + 120 * HOUR_MS, cache)
+    assert len(later) == 21
+    _, covered_start, covered_end = cache.load("binance", "BTCUSDT", "1h")
+    assert (covered_start, covered_end) == (START, START + 48 * HOUR_MS)
+
+
+def test_interval_free_data_shares_one_entry(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    collector = FakeCollector()
+    _fetch_with_cache(collector, "hyperliquid", "BTC", "1h", START, START + 48 * HOUR_MS, cache,
+                      keyed_by_interval=False)
+
+    collector.calls.clear()
+    df = _fetch_with_cache(collector, "hyperliquid", "BTC", "4h", START, START + 48 * HOUR_MS, cache,
+                           keyed_by_interval=False)
+    assert collector.calls == []
+    assert len(df) == 49
+
+
+class FakeKlinesResponse:
+    def __init__(self, rows, status=200):
+        self.status_code = status
+        self.content = json.dumps(rows).encode()
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Server Error")
+
+
+def test_binance_flags_failed_window_as_incomplete(monkeypatch):
+    failing_starts = {START + 100 * HOUR_MS}
+
+    def fake_get(url, params=None, **kwargs):
+        if params["startTime"] in failing_starts:
+            return FakeKlinesResponse([], status=500)
+        last = min(params["endTime"], params["startTime"] + (params["limit"] - 1) * HOUR_MS)
+        return FakeKlinesResponse([[t, "1", "2", "0.5", "1.5", "10", t + HOUR_MS - 1, "0", 1, "0", "0", "0"]
+                                   for t in range(params["startTime"], last + 1, HOUR_MS)])
+
+    monkeypatch.setattr(collectors._SESSION, "get", fake_get)
+    collector = collectors.BinanceDataCollector()
+    df = collector.get_historical_perpetual_klines("BTCUSDT", "1h", START, START + 299 * HOUR_MS)
+    assert len(df) == 200
+    assert df.attrs["complete"] is False
+
+    failing_starts.clear()
+    df = collector.get_historical_perpetual_klines("BTCUSDT", "1h", START, START + 299 * HOUR_MS)
+    assert len(df) == 300
+    assert df.attrs["complete"] is True
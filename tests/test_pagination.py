@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+import src.data._pagination as pagination
+from src.data._pagination import paginate
+from src.data.cache import FundingCache
+
+HOUR_MS = 60 * 60 * 1000
+INTERVAL_MS = 8 * HOUR_MS
+START = 1_693_526_400_000  # 2023-09-01, long settled
+
+
+class FakeResponse:
+    def __init__(self, records):
+        self.status_code = 200
+        self.content = json.dumps(records).encode()
+        self.text = ""
+        self.headers = {}
+
+
+class FakeFundingServer:
+    """Serves Binance-style funding records every 8 hours from START."""
+
+    def __init__(self, rate=0.0001):
+        self.rate = rate
+        self.overrides = {}
+        self.calls = 0
+
+    def request(self, method, url, headers=None, params=None, **kwargs):
+        self.calls += 1
+        first = max(0, -(-(params["startTime"] - START) // INTERVAL_MS))
+        records = []
+        ts = START + first * INTERVAL_MS
+        while ts <= params["endTime"] and len(records) < params["limit"]:
+            records.append({"fundingTime": ts, "fundingRate": str(self.overrides.get(ts, self.rate))})
+            ts += INTERVAL_MS
+        return FakeResponse(records)
+
+
+def fetch(session, start_time, end_time, cache):
+    def build_request(page_start, page_end):
+        return {"params": {"symbol": "BTCUSDT", "startTime": page_start,
+                           "endTime": page_end, "limit": 100}}
+
+    return paginate(session, "GET", "https://example.invalid", build_request, "binance", "BTCUSDT",
+                    "fundingTime", 100, start_time, end_time, INTERVAL_MS, cache=cache,
+                    sleep_time=0, max_workers=4)
+
+
+def test_paginate_returns_every_record_in_range():
+    series = fetch(FakeFundingServer(), START, START + 200 * 24 * HOUR_MS, cache=None)
+    assert len(series) == 601
+    assert np.all(np.diff(series["time"]) == INTERVAL_MS)
+
+
+def test_sub_window_of_warm_cache_stays_within_end_time(tmp_path):
+    cache = FundingCache(str(tmp_path / "funding.db"))
+    server = FakeFundingServer()
+    fetch(server, START, START + 200 * 24 * HOUR_MS, cache)
+
+    server.calls = 0
+    end_time = START + 10 * 24 * HOUR_MS
+    series = fetch(server, START, end_time, cache)
+
+    assert server.calls == 0
+    assert len(series) == 31
+    assert series["time"][-1] <= end_time
+    cache.close()
+
+
+def test_revised_latest_period_replaces_cached_value(tmp_path, monkeypatch):
+    cache = FundingCache(str(tmp_path / "funding.db"))
+    server = FakeFundingServer()
+    now = START + 10 * 24 * HOUR_MS
+    monkeypatch.setattr(pagination, "_now_ms", lambda: now)
+    fetch(server, START, now, cache)
+
+    # The newest period was not settled yet and is revised by the exchange.
+    latest = START + 30 * INTERVAL_MS
+    server.overrides[latest] = 0.0009
+    now += 24 * HOUR_MS
+    fetch(server, START, now, cache)
+
+    # Later runs read it from the cache, which must hold the revised value.
+    series = fetch(server, START, START + 31 * INTERVAL_MS - 1, cache)
+    assert series["rate"][series["time"] == latest].tolist() == [0.0009]
+    cache.close()